@@ -4,6 +4,7 @@ import asyncio
 import uvicorn
 import argparse
 import gradio as gr
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from fastapi import FastAPI
 
@@ -52,6 +53,23 @@ def setup_app():
     return app, gradio_block, rtc_container
 
 
+def find_pycache_dirs(project_dir):
+    venv_dir = os.path.join(project_dir, '.venv')
+    for root, dirs, files in os.walk(project_dir, topdown=True):
+        if '__pycache__' in dirs:
+            yield os.path.join(root, '__pycache__')
+        # 跳过虚拟环境与缓存目录本身，不再向下遍历
+        dirs[:] = [d for d in dirs if d != '__pycache__' and os.path.join(root, d) != venv_dir]
+
+
+def remove_pycache_dir(pycache_dir):
+    try:
+        shutil.rmtree(pycache_dir)
+        # logger.info(f"已删除缓存目录: {pycache_dir}")
+    except Exception as e:
+        logger.warning(f"删除缓存目录 {pycache_dir} 失败：{e}")
+
+
 def main():
     args = parse_args()
     logger_config, service_config, engine_config = load_configs(args)
@@ -84,17 +102,8 @@ def main():
             logger.error(f"关闭服务时出错：{e}")
         # 清除项目内 __pycache__ 缓存
         project_dir = DirectoryInfo.get_project_dir()
-        venv_dir = os.path.join(project_dir, '.venv')
-        for root, dirs, files in os.walk(project_dir):
-            if root.startswith(venv_dir):
-                continue
-            if '__pycache__' in dirs:
-                pycache_dir = os.path.join(root, '__pycache__')
-                try:
-                    shutil.rmtree(pycache_dir)
-                    # logger.info(f"已删除缓存目录: {pycache_dir}")
-                except Exception as e:
-                    logger.warning(f"删除缓存目录 {pycache_dir} 失败：{e}")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            executor.map(remove_pycache_dir, find_pycache_dirs(project_dir))
         logger.info("服务已退出。")
     except asyncio.CancelledError:
         logger.info("事件循环取消，服务正常退出。")
@@ -5,7 +5,7 @@ from chat_engine.data_models.chat_data_type import ChatDataType
 from chat_engine.data_models.runtime_data.data_bundle import DataBundle
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatData:
     source: Optional[str] = None
     type: ChatDataType = ChatDataType.NONE
@@ -4,13 +4,22 @@ import time
 from loguru import logger
 
 
+_DEBUG_LEVEL_NO = logger.level("DEBUG").no
+
+
 def timeit(func):
+    # 装饰时调试日志已被过滤，则直接返回原函数
+    if logger._core.min_level > _DEBUG_LEVEL_NO:
+        return func
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        # 调试日志未开启时不做计时
+        if logger._core.min_level > _DEBUG_LEVEL_NO:
+            return func(*args, **kwargs)
+        start_time = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        logger.debug(f"函数 {func.__name__} 执行耗时 {execution_time:.3f}s")
+        execution_time_ns = time.perf_counter_ns() - start_time
+        logger.debug(f"函数 {func.__name__} 执行耗时 {execution_time_ns / 1e9:.3f}s")
         return result
     return wrapper
@@ -1,26 +1,71 @@
 import os
-import torch
+import sys
 import asyncio
 import logging
+import importlib.abc
+import importlib.util
 from pathlib import Path
 from loguru import logger
-from transformers.utils import logging as transformers_logging
 
-transformers_logging.set_verbosity_error()
+
+class _PostImportPatcher(importlib.abc.MetaPathFinder):
+    """在第三方模块首次被导入后再执行补丁，避免启动时无条件加载 torch / transformers"""
+
+    def __init__(self):
+        self.patches = {}
+        self.resolving = set()
+
+    def register(self, module_name, patch):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            patch(module)
+            return
+        self.patches[module_name] = patch
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in self.patches or fullname in self.resolving:
+            return None
+        self.resolving.add(fullname)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            self.resolving.discard(fullname)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            # 仅在模块真正加载成功后才消费补丁，单纯的 find_spec 探测不会用掉补丁
+            patch = self.patches.pop(fullname, None)
+            if patch is not None:
+                patch(module)
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+_post_import_patcher = _PostImportPatcher()
+sys.meta_path.insert(0, _post_import_patcher)
+
+
+def _patch_transformers(_transformers):
+    from transformers.utils import logging as transformers_logging
+    transformers_logging.set_verbosity_error()
+_post_import_patcher.register('transformers', _patch_transformers)
 
 _orig_read_text = Path.read_text
-def _read_text_utf8(self, encoding=None, errors=None):
-    if encoding is None:
-        encoding = 'utf-8'
-    return _orig_read_text(self, encoding=encoding, errors=errors)
+def _read_text_utf8(self, encoding='utf-8', errors=None):
+    return _orig_read_text(self, encoding=encoding or 'utf-8', errors=errors)
 Path.read_text = _read_text_utf8
 
-_original_torch_load = torch.load
-def patched_torch_load(*args, **kwargs):
-    if 'weights_only' not in kwargs or kwargs['weights_only'] != True:
-        kwargs['weights_only'] = False
-    return _original_torch_load(*args, **kwargs)
-torch.load = patched_torch_load
+def _patch_torch(torch):
+    _original_torch_load = torch.load
+    def patched_torch_load(*args, **kwargs):
+        if 'weights_only' not in kwargs or kwargs['weights_only'] != True:
+            kwargs['weights_only'] = False
+        return _original_torch_load(*args, **kwargs)
+    torch.load = patched_torch_load
+_post_import_patcher.register('torch', _patch_torch)
 
 # 在 Windows 下使用 SelectorEventLoopPolicy，避免关闭时的 WinError 10054 噪声
 try:
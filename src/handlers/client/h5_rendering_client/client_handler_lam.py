@@ -1,4 +1,5 @@
 import asyncio
+import collections
 import json
 import os.path
 from typing import Dict, Optional, cast
@@ -13,7 +14,7 @@ from starlette.websockets import WebSocket, WebSocketState, WebSocketDisconnect
 
 from chat_engine.common.client_handler_base import ClientHandlerInfo, ClientSessionDelegate
 from chat_engine.common.engine_channel_type import EngineChannelType
-from chat_engine.common.handler_base import HandlerDataInfo, HandlerDetail, HandlerBaseInfo
+from chat_engine.common.handler_base import HandlerDataInfo, HandlerBaseInfo
 from chat_engine.contexts.handler_context import HandlerContext
 from chat_engine.contexts.session_context import SessionContext
 from chat_engine.data_models.chat_data.chat_data_model import ChatData
@@ -30,7 +31,7 @@ from handlers.client.rtc_client.client_handler_rtc import RtcClientSessionDelega
 class LamClientSessionDelegate(RtcClientSessionDelegate):
     def __init__(self):
         super().__init__()
-        self.output_queues[EngineChannelType.MOTION_DATA] = asyncio.Queue()
+        self.output_queues[EngineChannelType.MOTION_DATA] = (collections.deque(), asyncio.Event())
         self.quit = asyncio.Event()
 
     async def _ws_output_task(self, websocket: WebSocket):
@@ -219,8 +220,8 @@ class ClientHandlerLam(ClientHandlerRtc):
                                   session_delegate: ClientSessionDelegate):
         super().on_setup_session_delegate(session_context, handler_context, session_delegate)
 
-    def get_handler_detail(self, session_context: SessionContext, context: HandlerContext) -> HandlerDetail:
-        handler_detail = self.create_handler_detail(session_context, context)
+    def create_handler_detail(self, _session_context, _handler_context):
+        handler_detail = super().create_handler_detail(_session_context, _handler_context)
         handler_detail.inputs[ChatDataType.AVATAR_MOTION_DATA] = HandlerDataInfo(
             type=ChatDataType.AVATAR_MOTION_DATA
         )
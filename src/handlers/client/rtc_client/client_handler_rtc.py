@@ -1,17 +1,22 @@
 import asyncio
+import collections
+import functools
+import os
 import time
+import weakref
 from pathlib import Path
 from typing import Dict, Optional, cast, Union, Tuple
-from uuid import uuid4
+from uuid import UUID
 
 from loguru import logger
 
 from engine_utils.directory_info import DirectoryInfo
-from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 import gradio
 import numpy as np
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
 # noinspection PyPackageRequirements
 from fastrtc import Stream
 
@@ -32,35 +37,74 @@ from service.rtc_service.rtc_provider import RTCProvider
 from service.rtc_service.rtc_stream import RtcStream
 
 
+_UUID_POOL_BATCH = 1024
+_UUID_POOL: collections.deque = collections.deque()
+
+
+def _refill_uuid_pool():
+    # 一次 os.urandom 生成一批 UUID，摊薄每条文本消息的系统调用与格式化开销
+    raw = os.urandom(16 * _UUID_POOL_BATCH)
+    _UUID_POOL.extend(str(UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16))
+
+
+def _next_uuid() -> str:
+    try:
+        return _UUID_POOL.popleft()
+    except IndexError:
+        _refill_uuid_pool()
+        return _UUID_POOL.popleft()
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_utc_iso(epoch_sec: int) -> str:
+    t = time.gmtime(epoch_sec)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+
+
 class RtcClientSessionDelegate(ClientSessionDelegate):
+    modality_mapping = {
+        EngineChannelType.AUDIO: ChatDataType.MIC_AUDIO,
+        EngineChannelType.VIDEO: ChatDataType.CAMERA_VIDEO,
+        EngineChannelType.TEXT: ChatDataType.HUMAN_TEXT,
+    }
+
     def __init__(self):
         self.timestamp_generator = None
         self.data_submitter = None
         self.shared_states = None
-        self.output_queues = {
-            EngineChannelType.AUDIO: asyncio.Queue(),
-            EngineChannelType.VIDEO: asyncio.Queue(),
-            EngineChannelType.TEXT: asyncio.Queue(),
+        # 单生产者/单消费者场景，使用 deque + Event 代替 asyncio.Queue，避免逐帧的锁与计时器开销
+        self.output_queues: Dict[EngineChannelType, Tuple[collections.deque, asyncio.Event]] = {
+            EngineChannelType.AUDIO: (collections.deque(), asyncio.Event()),
+            EngineChannelType.VIDEO: (collections.deque(), asyncio.Event()),
+            EngineChannelType.TEXT: (collections.deque(), asyncio.Event()),
         }
         self.input_data_definitions: Dict[EngineChannelType, DataBundleDefinition] = {}
-        self.modality_mapping = {
-            EngineChannelType.AUDIO: ChatDataType.MIC_AUDIO,
-            EngineChannelType.VIDEO: ChatDataType.CAMERA_VIDEO,
-            EngineChannelType.TEXT: ChatDataType.HUMAN_TEXT,
-        }
 
     async def get_data(self, modality: EngineChannelType, timeout: Optional[float] = 0.1) -> Optional[ChatData]:
-        data_queue = self.output_queues.get(modality)
-        if data_queue is None:
+        output_queue = self.output_queues.get(modality)
+        if output_queue is None:
             return None
-        if timeout is not None and timeout > 0:
-            try:
-                data = await asyncio.wait_for(data_queue.get(), timeout)
-            except asyncio.TimeoutError:
-                return None
-        else:
-            data = await data_queue.get()
-        return data
+        data_queue, data_event = output_queue
+        while not data_queue:
+            data_event.clear()
+            if data_queue:
+                break
+            if timeout is not None and timeout > 0:
+                try:
+                    await asyncio.wait_for(data_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return None
+            else:
+                await data_event.wait()
+        return data_queue.popleft()
+
+    def put_output(self, modality: EngineChannelType, chat_data: ChatData):
+        output_queue = self.output_queues.get(modality)
+        if output_queue is None:
+            return
+        data_queue, data_event = output_queue
+        data_queue.append(chat_data)
+        data_event.set()
 
     def put_data(self, modality: EngineChannelType, data: Union[np.ndarray, str],
                  timestamp: Optional[Tuple[int, int]] = None, samplerate: Optional[int] = None, loopback: bool = False):
@@ -74,12 +118,13 @@ class RtcClientSessionDelegate(ClientSessionDelegate):
             return
         data_bundle = DataBundle(definition)
         if modality == EngineChannelType.AUDIO:
-            data_bundle.set_main_data(data.squeeze()[np.newaxis, ...])
+            # 单声道音频，reshape 在连续内存上直接返回视图
+            data_bundle.set_main_data(data.reshape(1, -1))
         elif modality == EngineChannelType.VIDEO:
-            data_bundle.set_main_data(data[np.newaxis, ...])
+            data_bundle.set_main_data(data.reshape((1,) + data.shape))
         elif modality == EngineChannelType.TEXT:
             data_bundle.add_meta('human_text_end', True)
-            data_bundle.add_meta('speech_id', str(uuid4()))
+            data_bundle.add_meta('speech_id', _next_uuid())
             data_bundle.set_main_data(data)
         else:
             return
@@ -91,7 +136,7 @@ class RtcClientSessionDelegate(ClientSessionDelegate):
         )
         self.data_submitter.submit(chat_data)
         if loopback:
-            self.output_queues[modality].put_nowait(chat_data)
+            self.put_output(modality, chat_data)
 
     def get_timestamp(self):
         return self.timestamp_generator()
@@ -100,9 +145,9 @@ class RtcClientSessionDelegate(ClientSessionDelegate):
         pass
 
     def clear_data(self):
-        for data_queue in self.output_queues.values():
-            while not data_queue.empty():
-                data_queue.get_nowait()
+        for data_queue, data_event in self.output_queues.values():
+            data_queue.clear()
+            data_event.clear()
 
 
 class ClientRtcConfigModel(HandlerBaseConfigModel, BaseModel):
@@ -129,6 +174,10 @@ class ClientHandlerRtc(ClientHandlerBase):
         self.rtc_streamer_factory: Optional[RtcStream] = None
 
         self.output_bundle_definitions: Dict[EngineChannelType, DataBundleDefinition] = {}
+        self.avatar_text_definition: Optional[DataBundleDefinition] = None
+        self.handler_detail: Optional[HandlerDetail] = None
+        # 会话到其历史记录对象的缓存，会话销毁后自动失效
+        self.session_histories: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
     def get_handler_info(self) -> HandlerBaseInfo:
         return HandlerBaseInfo(
@@ -174,6 +223,16 @@ class ClientHandlerRtc(ClientHandlerBase):
         text_output_definition.lockdown()
         self.output_bundle_definitions[EngineChannelType.TEXT] = text_output_definition
 
+        avatar_text_definition = DataBundleDefinition()
+        avatar_text_definition.add_entry(DataBundleEntry.create_text_entry(
+            "avatar_text",
+        ))
+        avatar_text_definition.lockdown()
+        self.avatar_text_definition = avatar_text_definition
+
+        # 处理器输入输出声明只依赖上面的定义，构建一次供所有会话共享
+        self.handler_detail = self.create_handler_detail(None, None)
+
     def load(self, engine_config: ChatEngineConfigModel, handler_config: Optional[HandlerBaseConfigModel] = None):
         self.engine_config = engine_config
         self.handler_config = cast(ClientRtcConfigModel, handler_config)
@@ -194,16 +253,17 @@ class ClientHandlerRtc(ClientHandlerBase):
         )
         webrtc.mount(fastapi)
 
+        # 初始化配置在启动后不再变化，预先序列化一次
+        init_config_content = orjson.dumps({
+            "avatar_config": avatar_config,
+            "rtc_configuration": turn_entity.rtc_configuration if turn_entity is not None else None,
+        })
+
         @fastapi.get('/soundtech/initconfig')
         async def init_config():
-            config = {
-                "avatar_config": avatar_config,
-                "rtc_configuration": turn_entity.rtc_configuration if turn_entity is not None else None,
-            }
-            return JSONResponse(status_code=200, content=config)
+            return Response(status_code=200, content=init_config_content, media_type="application/json")
 
-        @fastapi.get('/session/{session_id}/input')
-        async def input_to_session(session_id: str, text: str):
+        def submit_avatar_text(session_id: str, text: str):
             session_delegate = self.handler_delegate.find_session_delegate(session_id)
             if session_delegate is None:
                 msg = f"未找到会话 {session_id}。"
@@ -211,11 +271,9 @@ class ClientHandlerRtc(ClientHandlerBase):
                 return JSONResponse(status_code=404, content={"error": msg})
             try:
                 # 直接向 TTS 输入 AVATAR_TEXT，不经过大模型问答
-                definition = DataBundleDefinition()
-                definition.add_entry(DataBundleEntry.create_text_entry("avatar_text"))
-                data_bundle = DataBundle(definition)
+                data_bundle = DataBundle(self.avatar_text_definition)
                 data_bundle.set_main_data(text)
-                data_bundle.add_meta('speech_id', str(uuid4()))
+                data_bundle.add_meta('speech_id', _next_uuid())
                 data_bundle.add_meta('avatar_text_end', True)
 
                 chat_data = ChatData(
@@ -230,35 +288,7 @@ class ClientHandlerRtc(ClientHandlerBase):
                 logger.opt(exception=True).error(f"向会话 {session_id} 直接输入文本失败: {e}")
                 return JSONResponse(status_code=500, content={"error": "发送失败"})
 
-        @fastapi.post('/session/{session_id}/input')
-        async def input_to_session_post(session_id: str, payload: TextPayload):
-            session_delegate = self.handler_delegate.find_session_delegate(session_id)
-            if session_delegate is None:
-                msg = f"未找到会话 {session_id}。"
-                logger.error(msg)
-                return JSONResponse(status_code=404, content={"error": msg})
-            try:
-                definition = DataBundleDefinition()
-                definition.add_entry(DataBundleEntry.create_text_entry("avatar_text"))
-                data_bundle = DataBundle(definition)
-                data_bundle.set_main_data(payload.text)
-                data_bundle.add_meta('speech_id', str(uuid4()))
-                data_bundle.add_meta('avatar_text_end', True)
-
-                chat_data = ChatData(
-                    source="client",
-                    type=ChatDataType.AVATAR_TEXT,
-                    data=data_bundle,
-                    timestamp=session_delegate.get_timestamp(),
-                )
-                session_delegate.data_submitter.submit(chat_data)
-                return JSONResponse(status_code=200, content={"status": "ok"})
-            except Exception as e:
-                logger.opt(exception=True).error(f"向会话 {session_id} 直接输入文本失败: {e}")
-                return JSONResponse(status_code=500, content={"error": "发送失败"})
-
-        @fastapi.get('/session/{session_id}/answer')
-        async def speak_to_session(session_id: str, text: str):
+        def submit_human_text(session_id: str, text: str):
             session_delegate = self.handler_delegate.find_session_delegate(session_id)
             if session_delegate is None:
                 msg = f"未找到会话 {session_id}。"
@@ -272,19 +302,21 @@ class ClientHandlerRtc(ClientHandlerBase):
                 logger.opt(exception=True).error(f"向会话 {session_id} 发送文本失败: {e}")
                 return JSONResponse(status_code=500, content={"error": "发送失败"})
 
+        @fastapi.get('/session/{session_id}/input')
+        async def input_to_session(session_id: str, text: str):
+            return submit_avatar_text(session_id, text)
+
+        @fastapi.post('/session/{session_id}/input')
+        async def input_to_session_post(session_id: str, payload: TextPayload):
+            return submit_avatar_text(session_id, payload.text)
+
+        @fastapi.get('/session/{session_id}/answer')
+        async def speak_to_session(session_id: str, text: str):
+            return submit_human_text(session_id, text)
+
         @fastapi.post('/session/{session_id}/answer')
         async def speak_to_session_post(session_id: str, payload: TextPayload):
-            session_delegate = self.handler_delegate.find_session_delegate(session_id)
-            if session_delegate is None:
-                msg = f"未找到会话 {session_id}。"
-                logger.error(msg)
-                return JSONResponse(status_code=404, content={"error": msg})
-            try:
-                session_delegate.put_data(EngineChannelType.TEXT, payload.text, loopback=True)
-                return JSONResponse(status_code=200, content={"status": "ok"})
-            except Exception as e:
-                logger.opt(exception=True).error(f"向会话 {session_id} 发送文本失败: {e}")
-                return JSONResponse(status_code=500, content={"error": "发送失败"})
+            return submit_human_text(session_id, payload.text)
 
         @fastapi.get('/manage/sessions')
         async def list_sessions():
@@ -292,24 +324,28 @@ class ClientHandlerRtc(ClientHandlerBase):
                 engine = self.handler_delegate.engine_ref()
                 if engine is None:
                     return JSONResponse(status_code=500, content={"error": "引擎不可用"})
-                sessions_info = []
                 now_monotonic = time.monotonic()
-                now_wall = time.time()
-                for sid, chat_session in engine.sessions.items():
+                # 单调时钟到墙上时间的偏移，对所有会话相同
+                wall_offset = time.time() - now_monotonic
+                sessions_info = []
+                pending_sessions_info = []
+                # engine.sessions 按创建顺序插入，倒序遍历即为最新优先，无需再排序；尚未开始的会话排在最后
+                for sid, chat_session in reversed(engine.sessions.items()):
                     start_mono = getattr(chat_session.session_context, 'input_start_time', -1.0)
-                    uptime_sec = 0.0
-                    created_at_iso = None
                     if start_mono and start_mono > 0:
-                        uptime_sec = max(0.0, now_monotonic - start_mono)
-                        created_at_epoch = now_wall - uptime_sec
-                        created_at_iso = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(created_at_epoch))
-                    sessions_info.append({
-                        'id': sid,
-                        'created_at_iso': created_at_iso,
-                        'uptime_seconds': round(uptime_sec, 3),
-                    })
-                sessions_info.sort(key=lambda x: (x['created_at_iso'] or ''), reverse=True)
-                return JSONResponse(status_code=200, content={"sessions": sessions_info})
+                        sessions_info.append({
+                            'id': sid,
+                            'created_at_iso': _format_utc_iso(int(wall_offset + start_mono)),
+                            'uptime_seconds': round(max(0.0, now_monotonic - start_mono), 3),
+                        })
+                    else:
+                        pending_sessions_info.append({
+                            'id': sid,
+                            'created_at_iso': None,
+                            'uptime_seconds': 0.0,
+                        })
+                sessions_info.extend(pending_sessions_info)
+                return ORJSONResponse(status_code=200, content={"sessions": sessions_info})
             except Exception as e:
                 logger.opt(exception=True).error(f"获取会话列表失败: {e}")
                 return JSONResponse(status_code=500, content={"error": "获取失败"})
@@ -326,15 +362,21 @@ class ClientHandlerRtc(ClientHandlerBase):
                     logger.error(msg)
                     return JSONResponse(status_code=404, content={"error": msg})
                 history_list = None
-                for _name, record in chat_session.handlers.items():
-                    ctx = getattr(record.env, 'context', None)
-                    hist = getattr(ctx, 'history', None) if ctx is not None else None
-                    msg_hist = getattr(hist, 'message_history', None) if hist is not None else None
-                    if isinstance(msg_hist, list):
-                        history_list = msg_hist
-                        break
+                hist = self.session_histories.get(chat_session)
+                if hist is not None:
+                    history_list = hist.message_history
+                else:
+                    for _name, record in chat_session.handlers.items():
+                        ctx = getattr(record.env, 'context', None)
+                        hist = getattr(ctx, 'history', None) if ctx is not None else None
+                        msg_hist = getattr(hist, 'message_history', None) if hist is not None else None
+                        if isinstance(msg_hist, list):
+                            # 缓存历史记录所在对象，后续请求无需再遍历处理器
+                            self.session_histories[chat_session] = hist
+                            history_list = msg_hist
+                            break
                 if history_list is None:
-                    return JSONResponse(status_code=200, content={"items": [], "total": 0, "page": page, "page_size": page_size})
+                    return ORJSONResponse(status_code=200, content={"items": [], "total": 0, "page": page, "page_size": page_size})
                 total = len(history_list)
                 start = max(0, (page - 1) * page_size)
                 end = min(total, start + page_size)
@@ -345,7 +387,7 @@ class ClientHandlerRtc(ClientHandlerBase):
                         'content': getattr(m, 'content', ''),
                         'timestamp': getattr(m, 'timestamp', None),
                     })
-                return JSONResponse(status_code=200, content={"items": items, "total": total, "page": page, "page_size": page_size})
+                return ORJSONResponse(status_code=200, content={"items": items, "total": total, "page": page, "page_size": page_size})
             except Exception as e:
                 logger.opt(exception=True).error(f"获取会话 {session_id} 历史失败: {e}")
                 return JSONResponse(status_code=500, content={"error": "获取失败"})
@@ -435,16 +477,15 @@ class ClientHandlerRtc(ClientHandlerBase):
         )
 
     def get_handler_detail(self, session_context: SessionContext, context: HandlerContext) -> HandlerDetail:
-        return self.create_handler_detail(session_context, context)
+        # 所有会话共享同一实例，调用方只能读取，不可修改 inputs / outputs
+        return self.handler_detail
 
     def handle(self, context: HandlerContext, inputs: ChatData,
                output_definitions: Dict[ChatDataType, HandlerDataInfo]):
         context = cast(ClientRtcContext, context)
         if context.client_session_delegate is None:
             return
-        data_queue = context.client_session_delegate.output_queues.get(inputs.type.channel_type)
-        if data_queue is not None:
-            data_queue.put_nowait(inputs)
+        context.client_session_delegate.put_output(inputs.type.channel_type, inputs)
 
     def destroy_context(self, context: HandlerContext):
         pass